@@ -2,27 +2,46 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 import argparse
-import json
 import inspect
 import io
-import libaaron
+import keyword
+import sys
+import types
 import functools
 import typing as t
 
 
 # fake types
 Iter = t.Iterable
-PositionalParams = Iter[inspect.Parameter]
-FlagsParams = Iter[t.Tuple[inspect.Parameter, t.Optional[str]]]
+# (parameter, short flag, parameter name as it appears on the command line)
+SortedParam = t.Tuple[inspect.Parameter, t.Optional[str], str]
+PositionalParams = t.Tuple[SortedParam, ...]
+FlagsParams = t.Tuple[SortedParam, ...]
 OptionParams = FlagsParams
 Parser = argparse.ArgumentParser
 HelpDict = t.Dict[str, str]
+# (name, annotation) or (name, annotation, default). see schema_params
+Schema = t.Iterable[t.Tuple]
 
 
-class FileBase(io.TextIOBase):
+def loadjson(string: str) -> t.Any:
+    """parse a json argument. json is imported here, on first use, because
+    most scripts never need it.
+    """
+    import json
+    return json.loads(string)
+
+
+# argparse uses this in errors ("invalid json value"), as does the help text
+loadjson.__name__ = 'json'
+
+
+class FileBase:
     """Children of this class really just pass the arguments from their
     constructor to `open`. There are no real instances of the the classes.
     the mode argument is determined in the child.
+
+    It is a registered virtual subclass of io.TextIOBase, not a real one.
     """
     mode = ''
 
@@ -45,113 +64,177 @@ class AppendFile(FileBase):
     mode = 'a'
 
 
-def getshortflag(char: str, shortflags: t.Set[str]) -> t.Optional[str]:
-    """Check if a character has alread used as a short flag. If so, uppercase
-    it, otherwise return the character. If the uppercase character is also
-    used, return None. No shortflag is generated.
+io.TextIOBase.register(FileBase)
 
-    char -- the character to use
 
-    shortflags -- a set of flags already used. This function updates the set,
-                  so usage should be like this:
-
-    >>> used = set()
-    >>> for char in 'abccdce':
-    ...     flag = getshortflag(char, used)
-    ...     # etc
+def signature_params(function: t.Callable) -> t.Tuple[inspect.Parameter, ...]:
+    """get the parameters of a function as a tuple, rather than rebuilding a
+    view of the signature's mapping each time they're used.
     """
-    if char in shortflags:
-        char = char.upper()
-        if char in shortflags:
-            return None
+    return tuple(inspect.signature(function).parameters.values())
+
 
-    shortflags.add(char)
-    return char
+def schema_params(schema: Schema) -> t.List[inspect.Parameter]:
+    """build parameters from a schema instead of inspecting a function's
+    signature. Each item is a tuple of (name, annotation) or (name,
+    annotation, default). An annotation of None means no annotation. Like in
+    a signature, a name starting with '*' collects variadic positional
+    arguments, and all parameters after it are keyword-only. A bare '*' only
+    marks the parameters after it as keyword-only. e.g. the schema for
+    `def cp(*src, dst, recursive=False)` would be:
+
+    [('*src', None), ('dst', None), ('recursive', None, False)]
+    """
+    kind = inspect.Parameter.POSITIONAL_OR_KEYWORD
+    params = []
+    for name, annotation, *default in schema:
+        if annotation is None:
+            annotation = inspect.Parameter.empty
+        if name.startswith('*'):
+            if name != '*':
+                params.append(inspect.Parameter(
+                    name[1:], inspect.Parameter.VAR_POSITIONAL,
+                    annotation=annotation,
+                ))
+            kind = inspect.Parameter.KEYWORD_ONLY
+            continue
+        params.append(inspect.Parameter(
+            name, kind,
+            default=default[0] if default else inspect.Parameter.empty,
+            annotation=annotation,
+        ))
+
+    return params
 
 
 def sort_params(params: Iter[inspect.Parameter]) -> (
         t.Tuple[PositionalParams, FlagsParams, OptionParams]):
+    """sort parameters into positionals, flags and options in one pass,
+    working out the short flags as we go.
+
+    A flag or option gets the first character of its name as a short flag.
+    If that has been used, it's uppercased, and if that has also been used
+    (or uppercases to more than one character, like 'ß'), there is no short
+    flag. Used flags are tracked in the bitmask `used`, where bit n stands
+    for the character with code point n.
+    """
     positionals = []
     flags = []
     options = []
-    shortflags: t.Set[str] = set()
+    used = 0
     for param in params:
         if param.kind is param.VAR_KEYWORD:
-            pass
-        elif param.annotation is bool or isinstance(param.default, bool):
-            flags.append((param, getshortflag(param.name[0], shortflags)))
-        elif param.default == param.empty:
-            positionals.append(param)
+            continue
+        cliname = param.name.replace('_', '-')
+        if param.annotation is bool or isinstance(param.default, bool):
+            group = flags
+        elif param.default is param.empty:
+            positionals.append((param, None, cliname))
+            continue
         else:
-            options.append((param, getshortflag(param.name[0], shortflags)))
-
-    return positionals, flags, options
-
-
-class ArgType(t.NamedTuple):
-    iterable: bool
-    constructor: t.Optional[t.Callable[[str], t.Any]]
-
+            group = options
+
+        char = param.name[0]
+        # int() keeps the shift on Python ints. Compiled with Cython, ord()
+        # is a C long, and so would be the shift, which overflows.
+        bit = 1 << int(ord(char))
+        if used & bit:
+            char = char.upper()
+            if len(char) != 1:
+                group.append((param, None, cliname))
+                continue
+            bit = 1 << int(ord(char))
+        if used & bit:
+            group.append((param, None, cliname))
+        else:
+            used |= bit
+            group.append((param, char, cliname))
 
-def real_type(T: t.Type) -> ArgType:
-    """determine argument type from a concrete python type"""
-    if T is object or issubclass(T, t.Mapping):
-        return ArgType(False, json.loads)
+    return tuple(positionals), tuple(flags), tuple(options)
 
-    if issubclass(T, (io.IOBase, str)):
-        return ArgType(False, T)
 
-    if issubclass(T, t.Sequence):
-        return ArgType(True, None)
+# (iterable, constructor)
+ArgType = t.Tuple[bool, t.Optional[t.Callable[[str], t.Any]]]
 
-    return ArgType(False, T)
 
+# argument types of the classes seen so far. the builtins people actually use
+# are filled in up front, so they never go near the ABC checks.
+CLASS_TYPES: t.Dict[type, ArgType] = {
+    str: (False, str),
+    int: (False, int),
+    float: (False, float),
+    bool: (False, bool),
+    list: (True, None),
+    tuple: (True, None),
+    dict: (False, loadjson),
+}
 
-def typing_type(T: t.Type) -> ArgType:
-    """determine argument type from a type that is from the `typing` modlue"""
-    iterable, _ = real_type(T.__origin__)
-    if iterable:
-        try:
-            subscript = T.__args__[0]
-            _, constructor = real_type(subscript)
-            return ArgType(True, constructor)
-        except IndexError:
-            return ArgType(True, None)
 
-    return ArgType(False, None)
+# subscripted generics, from `typing` (List[int]) or builtins (list[int], on
+# 3.9+). The builtin ones pass isinstance(T, type) on 3.9 and 3.10, so they
+# have to be checked before classes.
+GENERIC_TYPES: t.Tuple[type, ...] = tuple(
+    cls for cls in (
+        getattr(t, '_GenericAlias', None),
+        getattr(types, 'GenericAlias', None),
+    ) if cls is not None
+)
 
 
-def annotation_type(annotation: t.Type) -> ArgType:
-    """determine argument type from type in annotation"""
-    if inspect.isfunction(annotation) or inspect.isbuiltin(annotation):
-        return ArgType(False, annotation)
-    if isinstance(annotation, t._GenericAlias):
-        return typing_type(annotation)
-    if isinstance(annotation, t.Type):
-        return real_type(annotation)
-    return ArgType(False, None)
+def resolve_type(T: t.Any) -> ArgType:
+    """determine argument type from an annotation or from the type of a
+    default value: a class, a type from the `typing` module or a function.
+    """
+    if isinstance(T, GENERIC_TYPES):
+        iterable, _ = resolve_type(T.__origin__)
+        if not iterable:
+            return False, None
+        if not T.__args__:
+            return True, None
+        _, constructor = resolve_type(T.__args__[0])
+        return True, constructor
+
+    if isinstance(T, type):
+        argtype = CLASS_TYPES.get(T)
+        if argtype is None:
+            # issubclass against ABCs is slow, hence the cache
+            if T is object or issubclass(T, t.Mapping):
+                argtype = False, loadjson
+            elif issubclass(T, (io.IOBase, str)):
+                argtype = False, T
+            elif issubclass(T, t.Sequence):
+                argtype = True, None
+            else:
+                argtype = False, T
+            CLASS_TYPES[T] = argtype
+        return argtype
+
+    if isinstance(T, (types.FunctionType, types.BuiltinFunctionType)):
+        return False, T
+
+    return False, None
 
 
 def varargs_type(param: inspect.Parameter) -> ArgType:
     """determine argument type for variadic positional parameter"""
     if param.annotation is param.empty:
-        return ArgType(True, None)
+        return True, None
 
-    _, constructor = annotation_type(param.annotation)
-    return ArgType(True, constructor)
+    _, constructor = resolve_type(param.annotation)
+    return True, constructor
 
 
 def default_type(default) -> ArgType:
     """infer the type from the default argument"""
     if default is None:
-        return ArgType(False, None)
-    iterable, constructor = real_type(type(default))
+        return False, None
+    iterable, constructor = resolve_type(type(default))
     if iterable:
         try:
-            _, constructor = real_type(type(default[0]))
+            _, constructor = resolve_type(type(default[0]))
         except IndexError:
             pass
-    return ArgType(iterable, constructor)
+    return iterable, constructor
 
 
 def infer_type(param: inspect.Parameter, positional: bool = False) -> ArgType:
@@ -160,90 +243,114 @@ def infer_type(param: inspect.Parameter, positional: bool = False) -> ArgType:
         return varargs_type(param)
 
     if param.annotation is not param.empty:
-        return annotation_type(param.annotation)
+        return resolve_type(param.annotation)
 
     if positional:
-        return ArgType(False, None)
+        return False, None
 
     return default_type(param.default)
 
 
+def add_option(
+        parser: Parser,
+        strings: t.List[str],
+        dest: str,
+        action: t.Type[argparse.Action],
+        **kwargs,
+) -> argparse.Action:
+    """add an optional argument to the parser. add_argument is slow: it works
+    out the dest and action class we already know and builds a throwaway
+    HelpFormatter to validate the metavar. For a plain ArgumentParser with
+    the default prefix_chars (so the option strings need no checking), make
+    the action directly and register it with _add_action, which is what
+    add_argument ends up doing.
+    """
+    if (type(parser) is argparse.ArgumentParser
+            and parser.prefix_chars == '-'
+            and parser.argument_default is None
+            and dest not in parser._defaults):
+        return parser._add_action(action(strings, dest, **kwargs))
+    return parser.add_argument(*strings, dest=dest, action=action, **kwargs)
+
+
 def add_arg(
         parser: Parser,
         name: str,
+        flag: str,
         param: inspect.Parameter,
         kwargs,
         help: HelpDict,
         shortflag: str = None,
         positional: bool = False
 ):
-    """add an argument to the parser with the given name. additional info is
-    derived from the function parameter. kwargs is a dictionary of keyword
+    """add an argument to the parser with the given name (used to look up
+    help) and command-line flag. additional info is derived from the function
+    parameter. kwargs is a dictionary of keyword
     arguments that will be passed to add_arg. This dictionary will be mutated.
     """
-    try:
-        kwargs["help"] = help[name]
-    except KeyError:
-        pass
+    helpstr = help.get(name)
+    if helpstr is not None:
+        kwargs['help'] = helpstr
 
     iterable, constructor = infer_type(param, positional)
     if iterable:
         kwargs['nargs'] = '*'
     if constructor:
         kwargs['type'] = constructor
-        tname = 'json' if constructor == json.loads else constructor.__name__
-        tstring = 'type: ' + tname
-        try:
-            kwargs['help'] += '; ' + tstring
-        except KeyError:
+        tstring = f'type: {constructor.__name__}'
+        if 'help' in kwargs:
+            kwargs['help'] = f"{kwargs['help']}; {tstring}"
+        else:
             kwargs['help'] = tstring
 
     if param.default is not param.empty:
-        defstr = 'default: %s' % getattr(param.default, 'name', param.default)
-        try:
-            kwargs['help'] += '; ' + defstr
-        except KeyError:
+        defstr = f"default: {getattr(param.default, 'name', param.default)}"
+        if 'help' in kwargs:
+            kwargs['help'] = f"{kwargs['help']}; {defstr}"
+        else:
             kwargs['help'] = defstr
 
-    if shortflag:
-        parser.add_argument('-' + shortflag, name.replace('_', '-'), **kwargs)
+    if positional:
+        parser.add_argument(flag, **kwargs)
     else:
-        parser.add_argument(name.replace('_', '-'), **kwargs)
+        strings = ['-' + shortflag, flag] if shortflag else [flag]
+        add_option(
+            parser, strings, param.name, argparse._StoreAction, **kwargs)
 
 
 def mkpositional(params: PositionalParams, parser: Parser, help: HelpDict):
     """add positional parameters to the parser"""
-    for param in params:
-        add_arg(parser, param.name, param, {}, help, positional=True)
+    for param, _, cliname in params:
+        add_arg(parser, param.name, cliname, param, {}, help, positional=True)
 
 
 def mkflags(params: FlagsParams, parser: Parser, help: HelpDict):
     """add flags to the parser"""
-    for param, shortflag in params:
-        kwargs = {'action': 'store_true'}
-        name = '--'
-        if param.default and param.default is not param.empty:
-            name += 'no-'
-            kwargs['action'] = 'store_false'
-        name += param.name
-        try:
-            kwargs['help'] = help[name]
-        except KeyError:
-            pass
+    for param, shortflag, cliname in params:
+        kwargs = {}
+        action: t.Type[argparse.Action] = argparse._StoreTrueAction
+        prefix = '--'
+        dest = param.name
+        if param.default is not param.empty and param.default:
+            prefix += 'no-'
+            dest = 'no_' + dest
+            action = argparse._StoreFalseAction
+        helpstr = help.get(prefix + param.name)
+        if helpstr is not None:
+            kwargs['help'] = helpstr
+        strings = [prefix + cliname]
         if shortflag:
-            parser.add_argument(  # type: ignore
-                '-' + shortflag, name.replace('_', '-'), **kwargs)
-        else:
-            parser.add_argument(  # type: ignore
-                name.replace('_', '-'), **kwargs)
+            strings.insert(0, '-' + shortflag)
+        add_option(parser, strings, dest, action, **kwargs)
 
 
 def mkoptions(params: OptionParams, parser: Parser, help: HelpDict):
     """add optional params to the parser"""
-    for param, shortflag in params:
+    for param, shortflag, cliname in params:
         add_arg(
             parser,
             '--' + param.name,
+            '--' + cliname,
             param,
             {'default': param.default},
             help,
@@ -251,117 +358,412 @@ def mkoptions(params: OptionParams, parser: Parser, help: HelpDict):
         )
 
 
+PositionalPlan = t.List[t.Tuple[str, bool]]
+KeywordPlan = t.List[t.Tuple[str, str]]
+
+
+def argplan(
+        positionals: PositionalParams,
+        flags: FlagsParams,
+        options: OptionParams,
+) -> t.Tuple[PositionalPlan, KeywordPlan]:
+    """work out, ahead of time, where each parsed argument goes when the
+    function is called. Returns a list of (dest, is_varargs) pairs for
+    positional arguments and a list of (dest, name) pairs for keyword
+    arguments, where dest is the attribute argparse stores the value in.
+    """
+    pargs = []
+    kwargs = []
+    for param, _, dest in positionals:
+        if param.kind is param.VAR_POSITIONAL:
+            pargs.append((dest, True))
+        elif param.kind is param.KEYWORD_ONLY:
+            kwargs.append((dest, param.name))
+        else:
+            pargs.append((dest, False))
+
+    for param, _, _ in flags:
+        if param.default is not param.empty and param.default:
+            kwargs.append(('no_' + param.name, param.name))
+        else:
+            kwargs.append((param.name, param.name))
+
+    for param, _, _ in options:
+        kwargs.append((param.name, param.name))
+
+    return pargs, kwargs
+
+
+def mkcaller(
+        function: t.Callable,
+        pargs: PositionalPlan,
+        kwargs: KeywordPlan,
+) -> t.Callable[[argparse.Namespace], t.Any]:
+    """generate a function which calls `function` with the arguments from a
+    parsed namespace, as laid out by argplan. The source is specialized for
+    the signature, so there are no loops or dict building at runtime. e.g.
+    for `def cp(*src, dst, recursive=False)`, it is:
+
+        def call(ns):
+            return function(*ns.src, dst=ns.dst, recursive=ns.recursive)
+    """
+    def attr(dest):
+        # positional dests keep their dashes, so they aren't identifiers
+        if dest.isidentifier() and not keyword.iskeyword(dest):
+            return 'ns.' + dest
+        return f'getattr(ns, {dest!r})'
+
+    args = [('*' if varargs else '') + attr(dest) for dest, varargs in pargs]
+    args.extend(f'{name}={attr(dest)}' for dest, name in kwargs)
+    source = f"def call(ns):\n    return function({', '.join(args)})\n"
+    scope = {'function': function}
+    exec(source, scope)
+    return scope['call']
+
+
+def quickparse(
+        parser: Parser, argv: t.Sequence[str]
+) -> t.Optional[argparse.Namespace]:
+    """a fast path for parser.parse_args which handles the common cases for
+    lazycli parsers in a single pass: exact option strings, option values
+    that don't start with '-' and positional arguments in one unbroken run.
+    Returns None for anything else (help, errors, '--', abbreviations,
+    combined short flags, etc.), so argparse can take care of it.
+
+    Type functions may have side effects (opening files, for one), so they
+    only run once all of argv has been accepted, and then in the same order
+    argparse would run them. If one fails, the error is reported the way
+    argparse would report it instead of falling back, so nothing is ever
+    converted twice.
+    """
+    # lazycli never adds these, but a parser passed in to Script might have
+    if parser._mutually_exclusive_groups or any(
+            a.choices is not None for a in parser._actions):
+        return None
+    options = parser._option_string_actions
+    positionals = [a for a in parser._actions if not a.option_strings]
+    for action in positionals:
+        if type(action) is not argparse._StoreAction or (
+                action.nargs is not None and action.nargs != '*'):
+            return None
+
+    namespace = argparse.Namespace()
+    for action in parser._actions:
+        if (action.dest is not argparse.SUPPRESS
+                and action.default is not argparse.SUPPRESS):
+            setattr(namespace, action.dest, action.default)
+    for dest, default in parser._defaults.items():
+        if not hasattr(namespace, dest):
+            setattr(namespace, dest, default)
+
+    seen = set(positionals)
+    # (action, argument string or list of strings), in the order argparse
+    # would convert them
+    pending: t.List[t.Tuple[argparse.Action, t.Any]] = []
+    strings: t.Sequence[str] = []
+    run = None  # (start, stop) of the positional arguments
+    run_at = len(pending)  # where the positionals go in pending
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        i += 1
+        if not arg.startswith('-'):
+            if run is None:
+                run = [i - 1, i]
+                run_at = len(pending)
+            elif run[1] == i - 1:
+                run[1] = i
+            else:
+                return None
+            continue
+
+        action = options.get(arg)
+        kind = type(action)
+        if kind in (argparse._StoreTrueAction, argparse._StoreFalseAction):
+            setattr(namespace, action.dest, action.const)
+        elif kind is not argparse._StoreAction:
+            return None
+        elif action.nargs is None:
+            if i == len(argv) or argv[i].startswith('-'):
+                return None
+            pending.append((action, argv[i]))
+            i += 1
+        elif action.nargs == '*':
+            start = i
+            while i < len(argv) and not argv[i].startswith('-'):
+                i += 1
+            pending.append((action, argv[start:i]))
+        else:
+            return None
+        seen.add(action)
+
+    if run is None:
+        run_at = len(pending)
+    else:
+        strings = argv[run[0]:run[1]]
+    # variadic positionals are greedy, in order, like argparse's regex
+    extra = len(strings) - sum(a.nargs is None for a in positionals)
+    if extra < 0:
+        return None
+    pos = 0
+    positional_values = []
+    for action in positionals:
+        if action.nargs is None:
+            positional_values.append((action, strings[pos]))
+            pos += 1
+        elif extra == 0 and action.default is not None:
+            setattr(namespace, action.dest, action.default)
+        else:
+            stop = pos + extra
+            positional_values.append((action, list(strings[pos:stop])))
+            pos = stop
+            extra = 0
+    if extra:
+        return None
+    pending[run_at:run_at] = positional_values
+
+    for action in parser._actions:
+        if action not in seen and action.required:
+            return None
+
+    # argv is accepted. From here on, it's only conversion.
+    try:
+        for action, value in pending:
+            if action.type is not None:
+                if isinstance(value, list):
+                    value = [parser._get_value(action, s) for s in value]
+                else:
+                    value = parser._get_value(action, value)
+            setattr(namespace, action.dest, value)
+
+        for action in parser._actions:
+            # argparse converts string defaults, too
+            if (action not in seen and action.type is not None
+                    and isinstance(action.default, str)
+                    and getattr(namespace, action.dest, None)
+                    is action.default):
+                setattr(namespace, action.dest,
+                        parser._get_value(action, action.default))
+    except argparse.ArgumentError as err:
+        # same as parse_known_args
+        if not getattr(parser, 'exit_on_error', True):
+            raise
+        parser.error(str(err))
+
+    return namespace
+
+
+# iterable output is written in chunks of roughly this many characters
+CHUNKSIZE = 1 << 16
+
+
+def emit_lines(out: Iter, iterprint: bool = False):
+    """print each item of an iterable on its own line. With iterprint, each
+    line is printed as soon as it's produced, rather than in chunks.
+    """
+    if out is None:
+        return
+    if iterprint:
+        for line in out:
+            print(line)
+        return
+
+    # gather lines into chunks so a long iterable costs a handful of write
+    # calls, not one per line, without holding all the output in memory.
+    write = sys.stdout.write
+    chunk = []
+    size = 0
+    try:
+        for line in out:
+            line = f'{line!s}\n'
+            chunk.append(line)
+            size += len(line)
+            if size >= CHUNKSIZE:
+                write(''.join(chunk))
+                chunk.clear()
+                size = 0
+    finally:
+        # write what was produced, even if the iterable raises part way
+        write(''.join(chunk))
+
+
+def emit_value(out: t.Any, iterprint: bool = False):
+    """print a return value, unless it is None"""
+    if out is not None:
+        print(out)
+
+
+# common return types emit can classify without going through the ABCs
+LINE_TYPES = frozenset({
+    list, tuple, set, frozenset, range, map, filter, zip, types.GeneratorType,
+})
+VALUE_TYPES = frozenset({str, int, float, bool, dict})
+# return annotations that rule out a string, so the value can go straight to
+# emit_lines. Others, like Iterable[str], might be satisfied by a str.
+LINE_ORIGINS = (list, tuple, set, frozenset, t.Iterator)
+
+
+def emit(out: t.Any, iterprint: bool = False):
+    """print a return value of unknown type"""
+    kind = type(out)
+    if kind in LINE_TYPES:
+        emit_lines(out, iterprint)
+    elif out is None:
+        return
+    elif kind in VALUE_TYPES:
+        print(out)
+    elif isinstance(out, Iter) and not isinstance(out, (str, t.Mapping)):
+        emit_lines(out, iterprint)
+    else:
+        print(out)
+
+
+def choose_emitter(returns: t.Any) -> t.Callable[..., None]:
+    """pick the output function for a return annotation ahead of time, so
+    the type of the return value needn't be checked on every run. Falls back
+    to `emit` if the annotation isn't conclusive.
+    """
+    if returns is None or returns is str:
+        return emit_value
+    # not every version of typing has the same classes for List[str], etc.,
+    # but they all have __origin__.
+    origin = getattr(returns, '__origin__', None) or returns
+    if isinstance(origin, type) and issubclass(origin, LINE_ORIGINS):
+        return emit_lines
+    return emit
+
+
 class Script:
+    __slots__ = (
+        'function',
+        'parsertype',
+        'help',
+        'positionals',
+        'flags',
+        'options',
+        'params',
+        'parser',
+        '_func',
+        '_emit',
+        '_subparsers',
+    )
+
     def __init__(
             self,
             function: t.Callable = None,
-            parser: type = Parser,
+            parser: t.Union[Parser, t.Callable[..., Parser]] = Parser,
             help: HelpDict = None,
+            schema: Schema = None,
     ):
-        """make a parser for a script.
+        """make a parser for a script. `parser` may be a parser class (or
+        other callable returning a parser) or an existing parser to add the
+        arguments to. If a schema is given, it is used instead of the
+        function's signature (see schema_params).
         """
         self.function = function
         self.parsertype = parser
         self.help = help or {}
-        self.positionals = []
-        self.flags = []
-        self.options = []
-
-    @libaaron.reify
-    def parser(self) -> Parser:
-        """returns the argparse.ArgumentParser for the instance"""
-        if not self.function:
-            return self.parsertype()
-        sig = inspect.signature(self.function)
-        self.positionals, self.flags, self.options = sort_params(
-            sig.parameters.values())
-        parser = self.parsertype(description=self.function.__doc__)
-        mkpositional(self.positionals, parser, self.help)
-        mkflags(self.flags, parser, self.help)
-        mkoptions(self.options, parser, self.help)
-        return parser
+        self.positionals: PositionalParams = ()
+        self.flags: FlagsParams = ()
+        self.options: OptionParams = ()
+        self.params: t.Tuple[inspect.Parameter, ...] = ()
+        self._func = None
+        self._subparsers = None
+        self._emit = emit
+        if isinstance(parser, argparse.ArgumentParser):
+            self.parsertype = type(parser)
+            self.parser = parser
+        elif function:
+            self.parser = parser(description=function.__doc__)
+        else:
+            self.parser = parser()
+        if not function:
+            return
+
+        if schema is None:
+            params = signature_params(function)
+        else:
+            params = schema_params(schema)
+        self.positionals, self.flags, self.options = sort_params(params)
+        self.params = tuple(
+            i[0] for i in (*self.positionals, *self.flags, *self.options))
+        annotations = getattr(function, '__annotations__', {})
+        self._emit = choose_emitter(
+            annotations.get('return', inspect.Signature.empty))
+        self._func = mkcaller(function, *argplan(
+            self.positionals, self.flags, self.options))
+        # the signature is static, so build the parser once, up front.
+        mkpositional(self.positionals, self.parser, self.help)
+        mkflags(self.flags, self.parser, self.help)
+        mkoptions(self.options, self.parser, self.help)
 
     @property
-    def params(self) -> t.Iterator[inspect.Parameter]:
-        """iterate over all parameters"""
-        yield from self.positionals
-        yield from (i[0] for i in self.flags)
-        yield from (i[0] for i in self.options)
-
-    @libaaron.reify
-    def subparsers(self) -> Parser:
+    def subparsers(self) -> argparse._SubParsersAction:
         """get a subparser for the instance"""
-        return self.parser.add_subparsers()
+        if self._subparsers is None:
+            self._subparsers = self.parser.add_subparsers()
+        return self._subparsers
+
+    def parse_args(
+            self,
+            args: t.Sequence[str] = None,
+            namespace: argparse.Namespace = None,
+    ) -> argparse.Namespace:
+        """parse arguments like argparse.ArgumentParser.parse_args, but try
+        quickparse first if the parser is a plain one.
+        """
+        parser = self.parser
+        if (namespace is None and self._subparsers is None
+                and type(parser) is argparse.ArgumentParser
+                and parser.prefix_chars == '-'
+                and parser.fromfile_prefix_chars is None):
+            parsed = quickparse(parser, sys.argv[1:] if args is None else args)
+            if parsed is not None:
+                return parsed
+        return parser.parse_args(args, namespace)
 
     def run(self, *args, iterprint=False, **kwargs):
         """run the generated cli script. *args and **kwargs are passed to
-        argparse.ArgumentParser.parse_args
+        parse_args
         """
-        args = {
-            k.replace('-', '_'): v for k, v in
-            vars(self.parser.parse_args(*args, **kwargs)).items()
-        }
-        delegate = args.pop('_func', None)
+        namespace = self.parse_args(*args, **kwargs)
+        scripts = [self] if self.function else []
+        delegate = getattr(namespace, '_script', None)
         if delegate:
-            top_args = {p.name: args.pop(p.name) for p in self.params}
-        else:
-            top_args = args
-        funcs = [(self._func, top_args)] if self.function else []
-
-        if delegate:
-            funcs.append((delegate, args))
+            scripts.append(delegate)
 
-        for func, args in funcs:
-            out = func(args)
-
-            if isinstance(out, Iter) and not isinstance(out, (str, t.Mapping)):
-                if iterprint:
-                    for line in out:
-                        print(line)
-                else:
-                    print(*out, sep='\n')
-            elif out is not None:
-                print(out)
-
-    def _func(self, args: t.MutableMapping):
-        # map args back onto the signature.
-        pargs = []  # type: t.List[t.Any]
-        for param in self.positionals:
-            if param.kind == param.VAR_POSITIONAL:
-                pargs.extend(args.pop(param.name))
-            elif param.kind == param.POSITIONAL_OR_KEYWORD:
-                pargs.append(args.pop(param.name))
-
-        for key, value in args.items():
-            if key.startswith('no_'):
-                args[key[3:]] = args.pop(key)
-                continue
-
-        return (self.function or (lambda: None))(*pargs, **args)
+        for scrpt in scripts:
+            scrpt._emit(scrpt._func(namespace), iterprint)
 
     def subcommand(
-            self, func: t.Callable = None, help: HelpDict = None
+            self,
+            func: t.Callable = None,
+            help: HelpDict = None,
+            schema: Schema = None,
     ) -> t.Callable:
         if not func:
-            return functools.partial(self.subcommand, help=help)
+            return functools.partial(
+                self.subcommand, help=help, schema=schema)
 
-        subparser = functools.partial(
-            self.subparsers.add_parser, func.__name__
-        )
-        subscript = Script(func, subparser, help=help)
-        subscript.parser.set_defaults(_func=subscript._func)
+        subparser = self.subparsers.add_parser(
+            func.__name__, description=func.__doc__)
+        subscript = Script(func, subparser, help=help, schema=schema)
+        subscript.parser.set_defaults(_script=subscript)
         return func
 
 
-def script(func: t.Callable = None, help: HelpDict = None):
+def script(
+        func: t.Callable = None,
+        help: HelpDict = None,
+        schema: Schema = None,
+):
     if not func:
-        if help:
-            return functools.partial(script, help=help)
+        if help or schema is not None:
+            return functools.partial(script, help=help, schema=schema)
         else:
             return Script()
 
-    scrpt = Script(func, help=help)
-    print(scrpt)
+    scrpt = Script(func, help=help, schema=schema)
     func.run = scrpt.run
     func.subcommand = scrpt.subcommand
     func._script = scrpt
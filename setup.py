@@ -1,3 +1,4 @@
+import os
 from setuptools import setup
 
 package = 'lazycli'
@@ -5,6 +6,13 @@ version = '0.6.1'
 with open('README.rst') as fh:
     long_description = fh.read()
 
+# opt-in: compile lazycli.core with Cython to cut interpreter overhead at
+# startup. Source installs are pure Python unless USE_CYTHON is set.
+ext_modules = []
+if os.environ.get('USE_CYTHON'):
+    from Cython.Build import cythonize
+    ext_modules = cythonize(['lazycli/core.py'], language_level=3)
+
 setup(name=package,
       version=version,
       description="generate command-line interfaces from function signatures",
@@ -12,5 +20,5 @@ setup(name=package,
       long_description_content_type='text/x-rst',
       url='https://github.com/ninjaaron/lazycli',
       packages=['lazycli'],
-      install_requires=['libaaron'],
+      ext_modules=ext_modules,
       python_requires='>=3.5')
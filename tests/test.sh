@@ -1,3 +1,8 @@
 #!/bin/sh
 ./test.py -h
 ./test.py foo bar baz
+./test_quickparse.py
+./test_schema.py -h
+./test_schema.py -v add 1 2.5 -s 10
+./test_schema.py greet bob -c -g Hi
+./test_generic.py 1 2 3 -s 2
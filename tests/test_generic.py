@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+import sys
+import lazycli
+
+if sys.version_info < (3, 9):
+    print('builtin generics need Python 3.9', file=sys.stderr)
+    sys.exit()
+
+
+@lazycli.script
+def total(numbers: list[int], scale: tuple[float, ...] = (1.0,)):
+    return sum(numbers) * sum(scale)
+
+
+if __name__ == '__main__':
+    total.run()
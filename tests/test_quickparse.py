@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""check that quickparse agrees with argparse, and that it falls back to
+argparse when it should.
+"""
+import argparse
+import contextlib
+import io
+import random
+import typing as t
+
+from lazycli.core import Script, quickparse
+
+
+def cp(*src, dst, recursive=False):
+    pass
+
+
+def mixed(
+        first_arg,
+        *rest: int,
+        foo_bar: int = 2,
+        quiet=False,
+        loud=True,
+        lst: t.List[float] = None,
+        items=[1, 2],
+        x: float = 0.0,
+        s='abc',
+):
+    pass
+
+
+def numbers(numbers: t.List[float]):
+    pass
+
+
+def positionals(a, b: int, c: t.List[int], d=None, e: t.List[str] = ('q',)):
+    pass
+
+
+def flags(verbose=False, name='x'):
+    pass
+
+
+FUNCTIONS = [cp, mixed, numbers, positionals, flags]
+WORDS = ['a', 'b', '1', '2', '3.5', '-1', 'x', '']
+OPTIONS = [
+    '-r', '--recursive', '-q', '--quiet', '-l', '--no-loud', '-f',
+    '--foo-bar', '-L', '--lst', '-i', '--items', '-x', '-s', '-d', '-e',
+    '-v', '-n', '--name',
+]
+# things quickparse leaves to argparse
+ODD = ['--', '-h', '--foo', '--name=z', '-rq', '-', '--recur']
+
+
+def parse(function, argv, quick):
+    """parse argv with quickparse or argparse. returns the namespace as a
+    dict, or the error message.
+    """
+    parser = Script(function).parser
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr), \
+                contextlib.redirect_stdout(io.StringIO()):
+            if quick:
+                namespace = quickparse(parser, argv)
+            else:
+                namespace = parser.parse_args(argv)
+    except SystemExit:
+        return stderr.getvalue()
+    return namespace and vars(namespace)
+
+
+def check(function, argv):
+    """returns True if quickparse handled argv itself"""
+    quick = parse(function, argv, True)
+    if quick is None:
+        return False
+    expected = parse(function, argv, False)
+    assert quick == expected, (function.__name__, argv, quick, expected)
+    return True
+
+
+def test_fallback():
+    for argv in (
+            ['-h'],
+            ['--', '-a'],
+            ['--recur', 'a', 'b'],
+            ['-rq', 'a'],
+            ['a', '-r', 'b'],
+            ['a', '--bogus'],
+            ['a', '--dst'],
+    ):
+        assert parse(cp, argv, True) is None, argv
+    for argv in (['--name=z'], ['-vn', 'z'], ['-n'], ['a']):
+        assert parse(flags, argv, True) is None, argv
+
+    # a parser passed in may have things quickparse doesn't check
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=['a', 'b'])
+    assert quickparse(Script(cp, parser).parser, ['n', '--mode', 'a']) is None
+    parser = argparse.ArgumentParser()
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('-x', action='store_true')
+    group.add_argument('-y', action='store_true')
+    Script(cp, parser)
+    assert quickparse(parser, ['n', '-x', '-y']) is None
+    assert quickparse(parser, ['n']) is None
+
+
+def test_convert_once():
+    calls = []
+
+    def count(string):
+        calls.append(string)
+        return string
+
+    def script(arg: count, opt: count = 'default'):
+        pass
+
+    # falls back: nothing may be converted before argparse takes over
+    assert parse(script, ['--opt', 'v', 'x', '--bogus'], True) is None
+    assert calls == []
+    # accepted: each value converted exactly once, in argv order
+    assert parse(script, ['--opt', 'v', 'x'], True) == {
+        'arg': 'x', 'opt': 'v'}
+    assert calls == ['v', 'x']
+    calls.clear()
+    # an unused string default is converted, like argparse does
+    parse(script, ['x'], True)
+    assert calls == ['x', 'default']
+
+
+def test_random():
+    rand = random.Random(0)
+    handled = 0
+    for _ in range(5000):
+        function = rand.choice(FUNCTIONS)
+        argv = [
+            rand.choice(rand.choice((WORDS, WORDS, OPTIONS, ODD)))
+            for _ in range(rand.randint(0, 7))
+        ]
+        handled += check(function, argv)
+    # make sure the fast path is actually being exercised
+    assert handled > 500, handled
+
+
+if __name__ == '__main__':
+    test_fallback()
+    test_convert_once()
+    test_random()
+    print('quickparse ok')
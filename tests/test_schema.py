@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+import lazycli
+
+
+@lazycli.script(schema=[('version', None, False)])
+def script(version=False):
+    if version:
+        return 1.0
+
+
+@script.subcommand(schema=[('*numbers', float), ('start', float, 0.0)])
+def add(*numbers: float, start: float = 0.0):
+    return sum(numbers, start)
+
+
+@script.subcommand(schema=[
+    ('name', None),
+    ('*', None),
+    ('greeting', None, 'Hello'),
+    ('caps', None, False),
+])
+def greet(name, *, greeting='Hello', caps=False):
+    if caps:
+        return f'{greeting}, {name}!'.upper()
+    return f'{greeting}, {name}!'
+
+
+if __name__ == '__main__':
+    script.run()